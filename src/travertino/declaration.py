@@ -1,12 +1,46 @@
+import sys
+from bisect import insort
+from contextlib import contextmanager
+from operator import methodcaller
+from types import FunctionType, MemberDescriptorType
+
 from .colors import color
 
 
+# The conversion used for each data type a Choices can accept, paired with
+# the exceptions that indicate the value isn't of that type.
+STRING_VALIDATOR = (methodcaller('strip'), (AttributeError,))
+INTEGER_VALIDATOR = (int, (ValueError, TypeError))
+NUMBER_VALIDATOR = (float, (ValueError, TypeError))
+COLOR_VALIDATOR = (color, (ValueError,))
+
+# A marker for a property that doesn't have a stored value.
+MISSING = object()
+
+# For each length of value that can be assigned to a directional property,
+# the index of the item used for the top, right, bottom and left directions.
+ASSIGNMENT_SCHEMES = {
+    1: (0, 0, 0, 0),
+    2: (0, 1, 0, 1),
+    3: (0, 1, 2, 1),
+    4: (0, 1, 2, 3),
+}
+
+
 class Choices:
     "A class to define allowable data types for a property"
+    __slots__ = (
+        'constants', 'default', 'string', 'integer', 'number', 'color',
+        '_canonical', '_options', '_options_str', '_validators',
+    )
+
     def __init__(
             self, *constants, default=False,
             string=False, integer=False, number=False, color=False):
-        self.constants = set(constants)
+        self.constants = frozenset(constants)
+        # Map each constant to itself, so that a matching value can be
+        # resolved to the canonical constant with a single lookup.
+        self._canonical = {const: const for const in self.constants}
         self.default = default
 
         self.string = string
@@ -23,41 +57,65 @@ class Choices:
             self._options.append("<number>")
         if self.color:
             self._options.append("<color>")
+        self._options_str = ", ".join(self._options)
 
-    def validate(self, value):
-        if self.default:
-            if value is None:
-                return None
+        # The accepted data types are fixed, so work out the conversions
+        # that need to be attempted once, rather than on every validation.
+        validators = []
         if self.string:
-            try:
-                return value.strip()
-            except AttributeError:
-                pass
+            validators.append(STRING_VALIDATOR)
         if self.integer:
-            try:
-                return int(value)
-            except (ValueError, TypeError):
-                pass
+            validators.append(INTEGER_VALIDATOR)
         if self.number:
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                pass
+            validators.append(NUMBER_VALIDATOR)
         if self.color:
+            validators.append(COLOR_VALIDATOR)
+        self._validators = tuple(validators)
+
+    def validate(self, value):
+        if self.default:
+            if value is None:
+                return None
+        for validator, errors in self._validators:
             try:
-                return color(value)
-            except ValueError:
+                return validator(value)
+            except errors:
                 pass
         if value == 'none':
             value = None
-        for const in self.constants:
-            if value == const:
-                return const
+        try:
+            return self._canonical[value]
+        except (KeyError, TypeError):
+            # Not a constant; a TypeError means the value isn't hashable.
+            pass
 
         raise ValueError(f"'{value}' is not a valid initial value")
 
     def __str__(self):
-        return ", ".join(self._options)
+        return self._options_str
+
+
+class SlotValues:
+    "A dict-like view of the property values stored in the slots of a style declaration."
+    __slots__ = ('style',)
+
+    def __init__(self, style):
+        self.style = style
+
+    def __contains__(self, attr_name):
+        return hasattr(self.style, attr_name)
+
+    def __getitem__(self, attr_name):
+        try:
+            return getattr(self.style, attr_name)
+        except AttributeError:
+            raise KeyError(attr_name)
+
+    def __setitem__(self, attr_name, value):
+        setattr(self.style, attr_name, value)
+
+    def get(self, attr_name, default=None):
+        return getattr(self.style, attr_name, default)
 
 
 class BaseStyle:
@@ -65,11 +123,42 @@ class BaseStyle:
 
     Exposes a dict-like interface.
     """
-    _PROPERTIES = {}
-    _ALL_PROPERTIES = {}
+    # While changes are being batched, __deferred holds the (property, value)
+    # pairs waiting to be applied. The name is mangled so that it can't clash
+    # with the attribute that stores a property's value.
+    __slots__ = ('_applicator', '__deferred')
+
+    _PROPERTIES = set()
+    # The names of the validated properties, in sorted order, and the
+    # attribute names that store their values.
+    _PROPERTIES_TUPLE = ()
+    _PROPERTIES_ATTRS = ()
+    # The initial value of each validated property.
+    _INITIALS = {}
+    # Map both the dashed and underscored spelling of each property name
+    # to the underscored name.
+    _KEY_ALIAS = {}
+    _ALL_KEY_ALIAS = {}
+    # (rendered name, attribute name) pairs, sorted by rendered name.
+    _STR_ITEMS = []
+    # The (method name, arguments) used to define each property, in order.
+    _DEFINITIONS = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Each style declaration tracks the properties defined on it.
+        cls._PROPERTIES = set()
+        cls._PROPERTIES_TUPLE = ()
+        cls._PROPERTIES_ATTRS = ()
+        cls._INITIALS = {}
+        cls._KEY_ALIAS = {}
+        cls._ALL_KEY_ALIAS = {}
+        cls._STR_ITEMS = []
+        cls._DEFINITIONS = []
 
     def __init__(self, **style):
         self._applicator = None
+        self.__deferred = None
         self.update(**style)
 
     ######################################################################
@@ -79,89 +168,200 @@ class BaseStyle:
     def apply(self, property, value):
         raise NotImplementedError('Style must define an apply method')  # pragma: no cover
 
+    def apply_batch(self, changes):
+        """Apply a list of (property, value) changes.
+
+        By default, each change is applied in turn; a style declaration can
+        override this to apply a group of changes in one pass.
+        """
+        for property, value in changes:
+            self.apply(property, value)
+
+    @contextmanager
+    def _defer_apply(self):
+        "Collect the changes made inside the block, and apply them as a single batch."
+        try:
+            batching = self.__deferred is not None
+        except AttributeError:
+            # BaseStyle.__init__() hasn't been called.
+            batching = False
+
+        if batching:
+            # Already collecting changes for an enclosing batch.
+            yield
+            return
+
+        self.__deferred = deferred = []
+        try:
+            yield
+        finally:
+            self.__deferred = None
+            if deferred:
+                self.apply_batch(deferred)
+
     ######################################################################
     # Provide a dict-like interface
     ######################################################################
 
+    def _stored_values(self):
+        "Return a mapping of attribute name to value for the properties that have been set."
+        try:
+            return self.__dict__
+        except AttributeError:
+            # Instances of BaseStyle itself have nowhere to store values.
+            return {}
+
     def reapply(self):
-        for style in self._PROPERTIES.get(self.__class__, set()):
-            self.apply(style, getattr(self, style))
+        values = self._stored_values()
+        initials = self._INITIALS
+        for style, attr_name in zip(self._PROPERTIES_TUPLE, self._PROPERTIES_ATTRS):
+            self.apply(style, values.get(attr_name, initials[style]))
 
     def update(self, **styles):
         "Set multiple styles on the style definition."
-        for name, value in styles.items():
-            name = name.replace('-', '_')
-            if name not in self._ALL_PROPERTIES.get(self.__class__, set()):
-                raise NameError("Unknown style '%s'" % name)
-
-            setattr(self, name, value)
+        with self._defer_apply():
+            for name, value in styles.items():
+                try:
+                    prop = self._ALL_KEY_ALIAS[name]
+                except KeyError:
+                    # Fall back to names that mix dashes and underscores.
+                    prop = self._ALL_KEY_ALIAS.get(name.replace('-', '_'))
+                    if prop is None:
+                        raise NameError("Unknown style '%s'" % name)
+
+                setattr(self, prop, value)
 
     def copy(self, applicator=None):
-        "Create a duplicate of this style declaration."
+        """Create a duplicate of this style declaration.
+
+        The stored values have already been validated, so they are copied
+        directly; no changes are applied to the duplicate.
+        """
         dup = self.__class__()
         dup._applicator = applicator
-        for style in self._PROPERTIES.get(self.__class__, set()):
-            try:
-                setattr(dup, style, getattr(self, '_%s' % style))
-            except AttributeError:
-                pass
+        values = self._stored_values()
+        dup_values = dup._stored_values()
+        for attr_name in self._PROPERTIES_ATTRS:
+            if attr_name in values:
+                dup_values[attr_name] = values[attr_name]
         return dup
 
+    def _property_name(self, name):
+        "Resolve a key with mixed dashes and underscores to a property name."
+        try:
+            return self._KEY_ALIAS[name.replace('-', '_')]
+        except KeyError:
+            raise KeyError(name)
+
     def __getitem__(self, name):
-        name = name.replace('-', '_')
-        if name in self._PROPERTIES.get(self.__class__, set()):
-            return getattr(self, name)
-        raise KeyError(name)
+        try:
+            prop = self._KEY_ALIAS[name]
+        except KeyError:
+            prop = self._property_name(name)
+        return getattr(self, prop)
 
     def __setitem__(self, name, value):
-        name = name.replace('-', '_')
-        if name in self._PROPERTIES.get(self.__class__, set()):
-            setattr(self, name, value)
-        else:
-            raise KeyError(name)
+        try:
+            prop = self._KEY_ALIAS[name]
+        except KeyError:
+            prop = self._property_name(name)
+        setattr(self, prop, value)
 
     def __delitem__(self, name):
-        name = name.replace('-', '_')
-        if name in self._PROPERTIES.get(self.__class__, set()):
-            delattr(self, name)
-        else:
-            raise KeyError(name)
+        try:
+            prop = self._KEY_ALIAS[name]
+        except KeyError:
+            prop = self._property_name(name)
+        delattr(self, prop)
 
     def items(self):
-        result = []
-        for name in self._PROPERTIES.get(self.__class__, set()):
-            try:
-                result.append((name, getattr(self, '_%s' % name)))
-            except AttributeError:
-                pass
-        return result
+        values = self._stored_values()
+        return [
+            (name, values[attr_name])
+            for name, attr_name in zip(self._PROPERTIES_TUPLE, self._PROPERTIES_ATTRS)
+            if attr_name in values
+        ]
 
     def keys(self):
-        result = set()
-        for name in self._PROPERTIES.get(self.__class__, set()):
-            if hasattr(self, '_%s' % name):
-                result.add(name)
-        return result
+        values = self._stored_values()
+        return {
+            name
+            for name, attr_name in zip(self._PROPERTIES_TUPLE, self._PROPERTIES_ATTRS)
+            if attr_name in values
+        }
 
     ######################################################################
     # Get the rendered form of the style declaration
     ######################################################################
     def __str__(self):
-        non_default = []
-        for name in self._PROPERTIES.get(self.__class__, set()):
-            try:
-                non_default.append((
-                    name.replace('_', '-'),
-                    getattr(self, '_%s' % name)
-                ))
-            except AttributeError:
-                pass
-
+        values = self._stored_values()
         return "; ".join(
-            f"{name}: {value}"
-            for name, value in sorted(non_default)
+            f"{name}: {values[attr_name]}"
+            for name, attr_name in self._STR_ITEMS
+            if attr_name in values
         )
 
+    @staticmethod
+    def _register_key_alias(aliases, name):
+        name = sys.intern(name)
+        aliases[name] = name
+        aliases[name.replace('_', '-')] = name
+
+    @classmethod
+    def _property_storage(cls, name, initial):
+        """Return the getter, loader, storer and discarder for a property's value.
+
+        The loader and discarder return ``MISSING`` if no value has been set.
+        """
+        attr_name = '_%s' % name
+        slot = cls.__dict__.get(attr_name)
+        if not isinstance(slot, MemberDescriptorType):
+            slot = None
+
+        if slot is None and cls.__dictoffset__:
+            # The value is stored in the instance __dict__.
+            def getter(self):
+                return self.__dict__.get(attr_name, initial)
+
+            def load(self):
+                return self.__dict__.get(attr_name, MISSING)
+
+            def store(self, value):
+                self.__dict__[attr_name] = value
+
+            def discard(self):
+                return self.__dict__.pop(attr_name, MISSING)
+
+        else:
+            if slot is not None:
+                # The value is stored in a slot (see styled_class()).
+                store = slot.__set__
+            elif cls._stored_values is _slot_values:
+                raise TypeError(
+                    f"Can't define property '{name}' on {cls.__name__}; "
+                    f"its instances have no __dict__, and no slot for '{attr_name}'"
+                )
+            else:
+                # Instances of this class (such as BaseStyle itself) have
+                # nowhere to store the value, but instances of a subclass
+                # with an instance __dict__ do.
+                def store(self, value):
+                    setattr(self, attr_name, value)
+
+            def getter(self):
+                return getattr(self, attr_name, initial)
+
+            def load(self):
+                return getattr(self, attr_name, MISSING)
+
+            def discard(self):
+                value = getattr(self, attr_name, MISSING)
+                if value is not MISSING:
+                    delattr(self, attr_name)
+                return value
+
+        return getter, load, store, discard
+
     @classmethod
     def validated_property(cls, name, choices, initial=None):
         "Define a simple validated property attribute."
@@ -170,88 +370,116 @@ class BaseStyle:
         except ValueError:
             raise ValueError(f"Invalid initial value '{initial}' for property '{name}'")
 
-        def getter(self):
-            return getattr(self, '_%s' % name, initial)
+        attr_name = '_%s' % name
+        # The getter, setter and deleter are specific to this property, so
+        # bind the validator now rather than looking it up on every set.
+        validate = choices.validate
+
+        # Work out how the value is stored, so the getter, setter and deleter
+        # can use that storage directly.
+        getter, load, store, discard = cls._property_storage(name, initial)
 
         def setter(self, value):
+            # Setting a property to the value it already holds is a no-op,
+            # so there's no need to validate the value again.
+            current = load(self)
+            if current is not MISSING and current == value:
+                return
+
             try:
-                value = choices.validate(value)
+                value = validate(value)
             except ValueError:
                 raise ValueError("Invalid value '{}' for property '{}'; Valid values are: {}".format(
                     value, name, choices
                 ))
 
-            if value != getattr(self, '_%s' % name, initial):
-                setattr(self, '_%s' % name, value)
-                self.apply(name, value)
+            if value != (initial if current is MISSING else current):
+                store(self, value)
+                try:
+                    deferred = self.__deferred
+                except AttributeError:
+                    # BaseStyle.__init__() hasn't been called.
+                    deferred = None
+                if deferred is None:
+                    self.apply(name, value)
+                else:
+                    deferred.append((name, value))
 
         def deleter(self):
-            try:
-                value = getattr(self, '_%s' % name, initial)
-                delattr(self, '_%s' % name)
-                if value != initial:
-                    self.apply(name, initial)
-            except AttributeError:
-                # Attribute doesn't exist
-                pass
-
-        cls._PROPERTIES.setdefault(cls, set()).add(name)
-        cls._ALL_PROPERTIES.setdefault(cls, set()).add(name)
+            value = discard(self)
+            # If the attribute doesn't exist, there's nothing to clear.
+            if value is not MISSING and value != initial:
+                self.apply(name, initial)
+
+        if name not in cls._PROPERTIES:
+            insort(cls._STR_ITEMS, (name.replace('_', '-'), attr_name))
+        cls._PROPERTIES.add(name)
+        cls._INITIALS[name] = initial
+        cls._PROPERTIES_TUPLE = tuple(sorted(cls._PROPERTIES))
+        cls._PROPERTIES_ATTRS = tuple('_%s' % prop for prop in cls._PROPERTIES_TUPLE)
+        cls._register_key_alias(cls._KEY_ALIAS, name)
+        cls._register_key_alias(cls._ALL_KEY_ALIAS, name)
+        cls._DEFINITIONS.append(('validated_property', (name, choices, initial)))
         setattr(cls, name, property(getter, setter, deleter))
 
     @classmethod
     def directional_property(cls, name):
         "Define a property attribute that proxies for top/right/bottom/left alternatives."
+        prop_name = name % ''
+        top_name = name % '_top'
+        right_name = name % '_right'
+        bottom_name = name % '_bottom'
+        left_name = name % '_left'
+
+        def properties(self):
+            # Look up the underlying property for each direction on the class
+            # of the style being accessed, as a subclass may redefine them.
+            style_class = type(self)
+            return (
+                getattr(style_class, top_name),
+                getattr(style_class, right_name),
+                getattr(style_class, bottom_name),
+                getattr(style_class, left_name),
+            )
+
         def getter(self):
+            top, right, bottom, left = properties(self)
             return (
-                getattr(self, name % '_top'),
-                getattr(self, name % '_right'),
-                getattr(self, name % '_bottom'),
-                getattr(self, name % '_left'),
+                top.fget(self),
+                right.fget(self),
+                bottom.fget(self),
+                left.fget(self),
             )
 
         def setter(self, value):
-            if isinstance(value, tuple):
-                if len(value) == 4:
-                    setattr(self, name % '_top', value[0])
-                    setattr(self, name % '_right', value[1])
-                    setattr(self, name % '_bottom', value[2])
-                    setattr(self, name % '_left', value[3])
-                elif len(value) == 3:
-                    setattr(self, name % '_top', value[0])
-                    setattr(self, name % '_right', value[1])
-                    setattr(self, name % '_bottom', value[2])
-                    setattr(self, name % '_left', value[1])
-                elif len(value) == 2:
-                    setattr(self, name % '_top', value[0])
-                    setattr(self, name % '_right', value[1])
-                    setattr(self, name % '_bottom', value[0])
-                    setattr(self, name % '_left', value[1])
-                elif len(value) == 1:
-                    setattr(self, name % '_top', value[0])
-                    setattr(self, name % '_right', value[0])
-                    setattr(self, name % '_bottom', value[0])
-                    setattr(self, name % '_left', value[0])
-                else:
+            top, right, bottom, left = properties(self)
+            # A single value (the most common case) applies to every direction.
+            if not isinstance(value, tuple):
+                top.fset(self, value)
+                right.fset(self, value)
+                bottom.fset(self, value)
+                left.fset(self, value)
+            else:
+                order = ASSIGNMENT_SCHEMES.get(len(value))
+                if order is None:
                     raise ValueError(
-                        "Invalid value for '{}'; value must be an number, or a 1-4 tuple.".format(
-                            name % ''
-                        )
+                        f"Invalid value for '{prop_name}'; value must be an number, or a 1-4 tuple."
                     )
-            else:
-                setattr(self, name % '_top', value)
-                setattr(self, name % '_right', value)
-                setattr(self, name % '_bottom', value)
-                setattr(self, name % '_left', value)
+                top.fset(self, value[order[0]])
+                right.fset(self, value[order[1]])
+                bottom.fset(self, value[order[2]])
+                left.fset(self, value[order[3]])
 
         def deleter(self):
-            delattr(self, name % '_top')
-            delattr(self, name % '_right')
-            delattr(self, name % '_bottom')
-            delattr(self, name % '_left')
+            top, right, bottom, left = properties(self)
+            top.fdel(self)
+            right.fdel(self)
+            bottom.fdel(self)
+            left.fdel(self)
 
-        cls._ALL_PROPERTIES.setdefault(cls, set()).add(name % '')
-        setattr(cls, name % '', property(getter, setter, deleter))
+        cls._register_key_alias(cls._ALL_KEY_ALIAS, prop_name)
+        cls._DEFINITIONS.append(('directional_property', (name,)))
+        setattr(cls, prop_name, property(getter, setter, deleter))
 
     # def list_property(name, choices, initial=None):
     #     "Define a property attribute that accepts a list of independently validated values."
@@ -282,3 +510,98 @@ class BaseStyle:
 
     #     _PROPERTIES.add(name)
     #     return property(getter, setter, deleter)
+
+
+def _slot_values(self):
+    return SlotValues(self)
+
+
+def _cell(value):
+    "Create a closure cell containing a value."
+    return (lambda: value).__closure__[0]
+
+
+def _rebind_class(value, old, new):
+    """Return a class attribute whose ``super()`` refers to a new class.
+
+    Functions that use ``super()`` refer to their class through a closure
+    cell; those are copied with a new cell, so the original is unaffected.
+    Anything else is returned unchanged.
+    """
+    if isinstance(value, (classmethod, staticmethod)):
+        func = _rebind_class(value.__func__, old, new)
+        return value if func is value.__func__ else type(value)(func)
+    if isinstance(value, property):
+        funcs = tuple(_rebind_class(func, old, new) for func in (value.fget, value.fset, value.fdel))
+        if funcs == (value.fget, value.fset, value.fdel):
+            return value
+        return type(value)(*funcs, value.__doc__)
+
+    if not isinstance(value, FunctionType) or '__class__' not in value.__code__.co_freevars:
+        return value
+    code = value.__code__
+    index = code.co_freevars.index('__class__')
+    if value.__closure__[index].cell_contents is not old:
+        return value
+
+    closure = value.__closure__[:index] + (_cell(new),) + value.__closure__[index + 1:]
+    func = FunctionType(code, value.__globals__, value.__name__, value.__defaults__, closure)
+    func.__kwdefaults__ = value.__kwdefaults__
+    func.__qualname__ = value.__qualname__
+    func.__module__ = value.__module__
+    func.__doc__ = value.__doc__
+    func.__annotations__ = value.__annotations__
+    func.__dict__.update(value.__dict__)
+    return func
+
+
+def styled_class(cls):
+    """Rebuild a style declaration so that property values are stored in slots.
+
+    Properties are defined after the class itself, so this must be applied
+    once all the properties have been defined::
+
+        MyStyle.validated_property(...)
+        MyStyle.directional_property(...)
+        MyStyle = styled_class(MyStyle)
+
+    This returns a *new* class, built from the bases and namespace of the
+    original. The qualified name is preserved, and methods that use
+    ``super()`` are copied so that they refer to the new class; the original
+    class is left intact. Instances of the new class are not instances of the
+    original class, so ``isinstance()`` checks against the original fail.
+
+    Instances of the new class don't have an instance ``__dict__`` (as long
+    as none of its base classes provide one), so they use considerably less
+    memory. As a result, any other instance attributes must be declared in
+    ``__slots__``, ``BaseStyle.__init__()`` must be called when an instance is
+    created, and no more validated properties can be defined on the class.
+    A class that already declares ``__slots__`` is returned unchanged.
+    """
+    if '__slots__' in cls.__dict__:
+        return cls
+
+    slots = cls._PROPERTIES_ATTRS
+    if not any(hasattr(base, '__weakref__') for base in cls.__bases__):
+        slots += ('__weakref__',)
+
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in ('__dict__', '__weakref__')
+    }
+    namespace['__slots__'] = slots
+    namespace['__qualname__'] = cls.__qualname__
+    namespace['_stored_values'] = _slot_values
+    styled = type(cls)(cls.__name__, cls.__bases__, namespace)
+
+    # Methods that use super() must refer to the new class.
+    for key, value in namespace.items():
+        rebound = _rebind_class(value, cls, styled)
+        if rebound is not value:
+            setattr(styled, key, rebound)
+
+    # Define the properties again, so that they use the slots.
+    for method, args in cls._DEFINITIONS:
+        getattr(styled, method)(*args)
+    return styled
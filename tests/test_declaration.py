@@ -1,7 +1,7 @@
 from unittest import TestCase
 from unittest.mock import Mock, call
 
-from travertino.declaration import BaseStyle, Choices
+from travertino.declaration import BaseStyle, Choices, styled_class
 
 
 VALUE1 = 'value1'
@@ -34,6 +34,25 @@ Style.validated_property('thing_left', choices=VALUE_CHOICES, initial=0)
 Style.directional_property('thing%s')
 
 
+class SlottedStyle(BaseStyle):
+    def __init__(self, applicator=None, **kwargs):
+        super().__init__(**kwargs)
+        self._applicator = applicator
+
+    def apply(self, property, value):
+        if self._applicator:
+            self._applicator.apply(property, value)
+
+
+SlottedStyle.validated_property('explicit_const', choices=VALUE_CHOICES, initial=VALUE1)
+SlottedStyle.validated_property('thing_top', choices=VALUE_CHOICES, initial=0)
+SlottedStyle.validated_property('thing_right', choices=VALUE_CHOICES, initial=0)
+SlottedStyle.validated_property('thing_bottom', choices=VALUE_CHOICES, initial=0)
+SlottedStyle.validated_property('thing_left', choices=VALUE_CHOICES, initial=0)
+SlottedStyle.directional_property('thing%s')
+SlottedStyle = styled_class(SlottedStyle)
+
+
 class TestNode:
     def __init__(self, style=None):
         if style is None:
@@ -50,6 +69,73 @@ class DeclarationTests(TestCase):
                 pass
             BadStyle.validated_property('value', choices=VALUE_CHOICES, initial='something')
 
+    def test_properties_per_class(self):
+        "Properties defined on one style class aren't registered on another"
+        class OtherStyle(BaseStyle):
+            pass
+        OtherStyle.validated_property('other', choices=VALUE_CHOICES, initial=0)
+
+        self.assertEqual(OtherStyle._PROPERTIES, {'other'})
+        self.assertNotIn('other', Style._PROPERTIES)
+        self.assertNotIn('explicit_const', OtherStyle._PROPERTIES)
+        self.assertEqual(BaseStyle._PROPERTIES, set())
+
+    def test_directional_property_subclass(self):
+        "A subclass can redefine the properties behind a directional property"
+        class SubStyle(Style):
+            pass
+        SubStyle.validated_property('thing_top', choices=Choices(integer=True), initial=5)
+
+        style = SubStyle()
+        self.assertEqual(style.thing, (5, 0, 0, 0))
+
+        with self.assertRaises(ValueError):
+            style.thing = VALUE1
+
+        style.thing = (10, 20)
+        self.assertEqual(style.thing, (10, 20, 10, 20))
+        del style.thing
+        self.assertEqual(style.thing, (5, 0, 0, 0))
+
+        # The parent class is unaffected
+        self.assertEqual(Style().thing, (0, 0, 0, 0))
+
+        # A direction can be redefined on the same class after the
+        # directional property has been used.
+        SubStyle.validated_property('thing_left', choices=Choices(integer=True), initial=9)
+        self.assertEqual(SubStyle().thing, (5, 0, 0, 9))
+
+    def test_base_style(self):
+        "A BaseStyle can be created directly"
+        style = BaseStyle()
+        self.assertEqual(str(style), '')
+        self.assertEqual(style.keys(), set())
+        self.assertEqual(str(style.copy()), '')
+
+    def test_property_on_dictless_base(self):
+        "A property defined on a base without an instance __dict__ is stored by subclasses"
+        class Base(BaseStyle):
+            __slots__ = ()
+
+        Base.validated_property('thing', choices=VALUE_CHOICES, initial=0)
+
+        class SubStyle(Base):
+            def __init__(self, **kwargs):
+                self.apply = Mock()
+                super().__init__(**kwargs)
+
+        self.assertEqual(Base().thing, 0)
+
+        style = SubStyle()
+        style.thing = 10
+        self.assertEqual(style.thing, 10)
+        style.apply.assert_called_once_with('thing', 10)
+
+        style.apply.reset_mock()
+        del style.thing
+        self.assertEqual(style.thing, 0)
+        style.apply.assert_called_once_with('thing', 0)
+
     def test_create_and_copy(self):
         style = Style(explicit_const=VALUE2, implicit=VALUE3)
 
@@ -57,6 +143,10 @@ class DeclarationTests(TestCase):
         self.assertEqual(dup.explicit_const, VALUE2)
         self.assertEqual(dup.explicit_value, 0)
         self.assertEqual(dup.implicit, VALUE3)
+        self.assertEqual(dup.keys(), {'explicit_const', 'implicit'})
+
+        # Copied values are not re-applied.
+        dup.apply.assert_not_called()
 
     def test_reapply(self):
         node = TestNode(style=Style(explicit_const=VALUE2, implicit=VALUE3))
@@ -119,6 +209,50 @@ class DeclarationTests(TestCase):
         self.assertIs(node.style.explicit_const, VALUE1)
         node.style.apply.assert_not_called()
 
+    def test_property_set_unchanged(self):
+        "Setting a property to the value it already holds is a no-op"
+        choices = Mock(wraps=VALUE_CHOICES)
+
+        class UnchangedStyle(BaseStyle):
+            def __init__(self, **kwargs):
+                self.apply = Mock()
+                super().__init__(**kwargs)
+        UnchangedStyle.validated_property('prop', choices=choices, initial=0)
+        choices.validate.reset_mock()
+
+        style = UnchangedStyle()
+
+        # The property is unset; setting it to the initial value is validated,
+        # but nothing is stored or applied.
+        style.prop = 0
+        choices.validate.assert_called_once_with(0)
+        self.assertEqual(style.keys(), set())
+        style.apply.assert_not_called()
+        choices.validate.reset_mock()
+
+        # Setting a new value is validated, stored and applied.
+        style.prop = 10
+        choices.validate.assert_called_once_with(10)
+        style.apply.assert_called_once_with('prop', 10)
+        choices.validate.reset_mock()
+        style.apply.reset_mock()
+
+        # Setting the stored value again skips validation, and isn't applied.
+        style.prop = 10
+        choices.validate.assert_not_called()
+        style.apply.assert_not_called()
+
+        # The same holds for a value that is equal to the stored value.
+        style.prop = 10.0
+        choices.validate.assert_not_called()
+        style.apply.assert_not_called()
+        self.assertIsInstance(style.prop, int)
+
+        # A value that isn't equal to the stored value is validated.
+        style.prop = '10'
+        choices.validate.assert_called_once_with('10')
+        style.apply.assert_not_called()
+
     def test_property_with_explicit_value(self):
         node = TestNode()
 
@@ -407,6 +541,80 @@ class DeclarationTests(TestCase):
 
         node.style.apply.assert_not_called()
 
+    def test_update_applies_batch(self):
+        node = TestNode()
+        node.style.apply_batch = Mock()
+
+        node.style.update(explicit_value=20, thing=(30, 40))
+
+        node.style.apply.assert_not_called()
+        node.style.apply_batch.assert_called_once_with([
+            ('explicit_value', 20),
+            ('thing_top', 30),
+            ('thing_right', 40),
+            ('thing_bottom', 30),
+            ('thing_left', 40),
+        ])
+
+        # Once the update is complete, changes are applied immediately.
+        node.style.apply_batch.reset_mock()
+        node.style.explicit_value = 10
+        node.style.apply.assert_called_once_with('explicit_value', 10)
+        node.style.apply_batch.assert_not_called()
+
+        # If nothing changes, there is nothing to apply.
+        node.style.update(explicit_value=10)
+        node.style.apply_batch.assert_not_called()
+
+        # Changes made before an invalid style is encountered are still applied.
+        with self.assertRaises(NameError):
+            node.style.update(explicit_none=5, not_a_property=10)
+
+        node.style.apply_batch.assert_called_once_with([('explicit_none', 5)])
+
+    def test_mixed_key_spelling(self):
+        "Keys can mix dashes and underscores"
+        class MixedStyle(BaseStyle):
+            def __init__(self, **kwargs):
+                self.apply = Mock()
+                super().__init__(**kwargs)
+        MixedStyle.validated_property('long_thing_name', choices=VALUE_CHOICES, initial=0)
+
+        style = MixedStyle()
+        style['long-thing_name'] = 10
+        self.assertEqual(style['long_thing-name'], 10)
+        del style['long-thing_name']
+        self.assertEqual(style.long_thing_name, 0)
+
+        style.update(**{'long_thing-name': 20})
+        self.assertEqual(style.long_thing_name, 20)
+
+        with self.assertRaises(KeyError):
+            style['long-thing_nam']
+
+        with self.assertRaises(NameError):
+            style.update(**{'long-thing_nam': 20})
+
+    def test_update_deferred_property(self):
+        "A property can be named 'deferred' without clashing with batched updates"
+        class DeferredStyle(BaseStyle):
+            def __init__(self, **kwargs):
+                self.apply = Mock()
+                super().__init__(**kwargs)
+        DeferredStyle.validated_property('deferred', choices=VALUE_CHOICES, initial=0)
+        DeferredStyle.validated_property('other', choices=VALUE_CHOICES, initial=0)
+
+        style = DeferredStyle(deferred=10)
+        style.update(other=20, deferred=30)
+
+        self.assertEqual(style.deferred, 30)
+        self.assertEqual(style.other, 20)
+        style.apply.assert_has_calls([
+            call('deferred', 10),
+            call('other', 20),
+            call('deferred', 30),
+        ])
+
     def test_str(self):
         node = TestNode()
 
@@ -477,3 +685,168 @@ class DeclarationTests(TestCase):
 
         with self.assertRaises(KeyError):
             del node.style['no-such-property']
+
+
+class SlottedDeclarationTests(TestCase):
+    def test_no_instance_dict(self):
+        style = SlottedStyle()
+        self.assertFalse(hasattr(style, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            style.not_a_property = 10
+
+    def test_super(self):
+        "Methods that use super() work on the rebuilt class"
+        applicator = Mock()
+        style = SlottedStyle(applicator=applicator, explicit_const=VALUE2)
+
+        self.assertIs(style._applicator, applicator)
+        self.assertEqual(style.explicit_const, VALUE2)
+
+        style.thing = 10
+        self.assertEqual(applicator.apply.call_count, 4)
+
+    def test_original_class(self):
+        "The original class still works after it has been styled"
+        class OriginalStyle(BaseStyle):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+
+            def apply(self, property, value):
+                pass
+
+            @property
+            def base_class(self):
+                return super().__thisclass__
+
+        OriginalStyle.validated_property('prop', choices=VALUE_CHOICES, initial=0)
+        Styled = styled_class(OriginalStyle)
+
+        style = OriginalStyle(prop=10)
+        self.assertEqual(style.prop, 10)
+        self.assertIs(style.base_class, OriginalStyle)
+
+        styled = Styled(prop=20)
+        self.assertEqual(styled.prop, 20)
+        self.assertIs(styled.base_class, Styled)
+
+    def test_qualname(self):
+        class NestedStyle(BaseStyle):
+            pass
+        NestedStyle.validated_property('prop', choices=VALUE_CHOICES, initial=0)
+        qualname = NestedStyle.__qualname__
+
+        self.assertEqual(styled_class(NestedStyle).__qualname__, qualname)
+
+    def test_property_after_styled_class(self):
+        "Validated properties can't be added once property values are stored in slots"
+        with self.assertRaises(TypeError):
+            SlottedStyle.validated_property('extra', choices=VALUE_CHOICES, initial=0)
+
+        self.assertFalse(hasattr(SlottedStyle, 'extra'))
+
+    def test_declared_slots(self):
+        class DeclaredStyle(BaseStyle):
+            __slots__ = ('extra',)
+
+        self.assertIs(styled_class(DeclaredStyle), DeclaredStyle)
+
+    def test_property(self):
+        applicator = Mock()
+        style = SlottedStyle().copy(applicator)
+
+        # Default value is VALUE1
+        self.assertIs(style.explicit_const, VALUE1)
+        applicator.apply.assert_not_called()
+
+        # Modify the value
+        style.explicit_const = 10
+        self.assertEqual(style.explicit_const, 10)
+        applicator.apply.assert_called_once_with('explicit_const', 10)
+        applicator.apply.reset_mock()
+
+        # Set the value to the same value.
+        # No dirty notification is sent
+        style.explicit_const = 10
+        applicator.apply.assert_not_called()
+
+        # Invalid values are rejected
+        with self.assertRaises(ValueError):
+            style.explicit_const = 'invalid'
+
+        # Clear the property
+        del style.explicit_const
+        self.assertIs(style.explicit_const, VALUE1)
+        applicator.apply.assert_called_once_with('explicit_const', VALUE1)
+        applicator.apply.reset_mock()
+
+        # Clear the property again; this is a no-op.
+        del style.explicit_const
+        self.assertIs(style.explicit_const, VALUE1)
+        applicator.apply.assert_not_called()
+
+    def test_directional_property(self):
+        applicator = Mock()
+        style = SlottedStyle().copy(applicator)
+
+        style.thing = (10, 20)
+        self.assertEqual(style.thing, (10, 20, 10, 20))
+        applicator.apply.assert_has_calls([
+            call('thing_top', 10),
+            call('thing_right', 20),
+            call('thing_bottom', 10),
+            call('thing_left', 20),
+        ])
+
+        del style.thing
+        self.assertEqual(style.thing, (0, 0, 0, 0))
+
+    def test_dict(self):
+        applicator = Mock()
+        style = SlottedStyle().copy(applicator)
+
+        style.update(explicit_const=VALUE2, thing=(30, 40, 50, 60))
+        self.assertEqual(applicator.apply.call_count, 5)
+
+        self.assertEqual(
+            style.keys(),
+            {'explicit_const', 'thing_bottom', 'thing_left', 'thing_right', 'thing_top'}
+        )
+        self.assertEqual(
+            style.items(),
+            [
+                ('explicit_const', 'value2'),
+                ('thing_bottom', 50),
+                ('thing_left', 60),
+                ('thing_right', 40),
+                ('thing_top', 30),
+            ]
+        )
+        self.assertEqual(
+            str(style),
+            "explicit-const: value2; "
+            "thing-bottom: 50; "
+            "thing-left: 60; "
+            "thing-right: 40; "
+            "thing-top: 30"
+        )
+
+        style['thing-bottom'] = 10
+        self.assertEqual(style['thing-bottom'], 10)
+        del style['thing-bottom']
+        self.assertEqual(style['thing-bottom'], 0)
+
+        # Copies hold the same values
+        dup = style.copy()
+        self.assertEqual(dup.items(), style.items())
+
+        # Reapply applies every property, set or not
+        applicator.apply.reset_mock()
+        style.reapply()
+        applicator.apply.assert_has_calls([
+            call('explicit_const', VALUE2),
+            call('thing_bottom', 0),
+            call('thing_left', 60),
+            call('thing_right', 40),
+            call('thing_top', 30),
+        ])